@@ -0,0 +1,213 @@
+import math
+from functools import partial
+from typing import NamedTuple, Union, List
+
+import numpy as np
+
+
+class MeanStddev(NamedTuple):
+    """ Value with a standard deviation, displayed as 'mean +/- stddev' """
+    mean: float
+    stddev: float
+
+    def __str__(self):
+        return f'{self.mean} +/- {self.stddev}'
+
+
+class CycleRange(NamedTuple):
+    """ Range of cycles, displayed as 'first - last' """
+    first: float
+    last: float
+
+    def __str__(self):
+        return f'{self.first} - {self.last}'
+
+
+class FieldValues(tuple):
+    """ Values of multiple fields shown in one cell, displayed as 'a / b' """
+    def __str__(self):
+        return ' / '.join(str(value) for value in self)
+
+
+# Cell values that hold more than one number, only turned into text for display
+COMPOSITE_VALUE_TYPES = (MeanStddev, CycleRange, FieldValues)
+
+
+def render_value(value):
+    """ Display form of a cell value, composite values become text and numbers are left as they are """
+    return str(value) if isinstance(value, COMPOSITE_VALUE_TYPES) else value
+
+
+# Kinds of values a column can hold, decided by probing the first row of each row type
+FIELDS = 'fields'
+MEAN_STDDEV = 'mean_stddev'
+CYCLE_RANGE = 'cycle_range'
+SCALAR = 'scalar'
+MISSING = 'missing'
+
+
+def _create_cycle_range(first, last):
+    """ A single cycle is shown as a plain number """
+    return first if first == last else CycleRange(first, last)
+
+
+def _create_field_values(*values):
+    return FieldValues(values)
+
+
+# Composite values built from their (formatted) parts, keyed by the kind of column values
+COMPOSITE_VALUE_FACTORIES = {
+    MEAN_STDDEV: MeanStddev,
+    CYCLE_RANGE: _create_cycle_range,
+    FIELDS: _create_field_values,
+}
+
+
+def _scale_and_round(values: np.ndarray, scale, precision) -> list:
+    """
+    Scales and rounds a column of raw values, as plain Python numbers. The values are rounded with round()
+    rather than np.round, which rounds some halves (e.g. 0.035) the other way. NaN values stay NaN,
+    without a precision the other values become integers.
+    """
+    # Divided rather than multiplied by the reciprocal, which changes the rounding of some values
+    values = values / scale
+    if precision is not None:
+        # round() leaves NaN as it is, no need to check each value
+        return list(map(partial(round, ndigits=precision), values.tolist()))
+
+    # np.rint rounds halves to even like round() does, the non NaN values are then turned into integers
+    values = np.rint(values)
+    is_number = ~np.isnan(values)
+    rounded = values.astype(object)
+    rounded[is_number] = values[is_number].astype(np.int64).tolist()
+    return rounded.tolist()
+
+
+def _object_array(values: list) -> np.ndarray:
+    """ 1-d object array, without NumPy unpacking the tuples into a second dimension """
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class ColumnDef:
+    """
+     Represents a data value from the Illumina InterOp output
+    """
+    __slots__ = ('name', 'fields', '_field', 'precision', 'scale', '_kind_cache', '_extractor_cache')
+
+    def __init__(self, name: str, field: Union[str, List[str]], **kwargs):
+        self.name = name
+
+        # Allow multiple fields in one 'cell'
+        self.fields = [field] if isinstance(field, str) else list(field)
+        # The common single field case is kept as a plain string, None when there are multiple fields
+        self._field = self.fields[0] if len(self.fields) == 1 else None
+
+        # Default precision and scale to 2 and 1, respectively
+        self.precision = kwargs.get('precision', 2)
+        self.scale = kwargs.get('scale', 1)
+
+        # Value kinds and extractors keyed by row type, created on first use
+        self._kind_cache = {}
+        self._extractor_cache = {}
+
+    def get_raw_extractor(self, row):
+        """
+        Function reading the unformatted number(s) of this column from rows of the same type as the given row,
+        a float for plain values and a tuple of floats for values that are shown as composite values.
+        The row attributes are a proxy of the c implementation, the values are actually a method getter.
+        """
+        row_type = type(row)
+        extractor = self._extractor_cache.get(row_type)
+        if extractor is None:
+            extractor = self._extractor_cache[row_type] = self._create_raw_extractor(row)
+        return extractor
+
+    def format_raw_column(self, raw_values: list, row) -> np.ndarray:
+        """
+        Scales and rounds the raw numbers of a whole column, as read by get_raw_extractor for the type of the
+        given row. Values with mean/std deviations, ranges and multiple fields become MeanStddev, CycleRange
+        and FieldValues, use render_value to display them.
+        """
+        kind = self._get_kind(row)
+        if kind == SCALAR:
+            return self._format_array(np.array(raw_values, dtype=np.float64))
+        elif kind == MISSING:
+            return np.full(len(raw_values), np.nan)
+
+        # Composite values, one column of raw numbers per part
+        parts = [self._format_list(part) for part in np.array(raw_values, dtype=np.float64).T]
+        create_value = COMPOSITE_VALUE_FACTORIES[kind]
+        return _object_array([create_value(*values) for values in zip(*parts)])
+
+    def _get_kind(self, row) -> str:
+        """ Probes a row for the kind of values this column holds, once per row type """
+        row_type = type(row)
+        kind = self._kind_cache.get(row_type)
+        if kind is None:
+            kind = self._kind_cache[row_type] = self._probe_kind(row)
+        return kind
+
+    def _probe_kind(self, row) -> str:
+        if self._field is None:
+            return FIELDS
+
+        value_method = getattr(row, self._field)
+        if value_method is None:
+            return MISSING
+
+        value = value_method()
+        if hasattr(value, 'mean'):
+            return MEAN_STDDEV
+        elif hasattr(value, 'error_cycle_range'):
+            return CYCLE_RANGE
+        return SCALAR
+
+    def _format_array(self, values: np.ndarray) -> np.ndarray:
+        """ Column of plain values, without precision the values become integers unless one is NaN """
+        return np.array(self._format_list(values))
+
+    def _format_list(self, values: np.ndarray) -> list:
+        """ Numbers inside composite values, as plain Python numbers """
+        return _scale_and_round(values, self.scale, self.precision)
+
+    def _create_raw_extractor(self, row):
+        """ Reads the raw number(s) of a row, the extractor depends on the kind of values for the row type """
+        return self._RAW_EXTRACTOR_FACTORIES[self._get_kind(row)](self)
+
+    def _create_scalar_extractor(self):
+        field = self._field
+        return lambda r: getattr(r, field)()
+
+    def _create_missing_extractor(self):
+        return lambda r: math.nan
+
+    def _create_mean_stddev_extractor(self):
+        field = self._field
+
+        def extract_mean_stddev(r):
+            value = getattr(r, field)()
+            return value.mean(), value.stddev()
+        return extract_mean_stddev
+
+    def _create_cycle_range_extractor(self):
+        field = self._field
+
+        def extract_cycle_range(r):
+            error_range = getattr(r, field)().error_cycle_range()
+            return error_range.first_cycle(), error_range.last_cycle()
+        return extract_cycle_range
+
+    def _create_fields_extractor(self):
+        fields = tuple(self.fields)
+        return lambda r: tuple(getattr(r, field)().mean() for field in fields)
+
+    # Raw extractors keyed by the kind of values, the kind is only probed once per row type
+    _RAW_EXTRACTOR_FACTORIES = {
+        SCALAR: _create_scalar_extractor,
+        MISSING: _create_missing_extractor,
+        MEAN_STDDEV: _create_mean_stddev_extractor,
+        CYCLE_RANGE: _create_cycle_range_extractor,
+        FIELDS: _create_fields_extractor,
+    }
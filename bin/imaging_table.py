@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from interop import py_interop_table
+
+
+def get_imaging_table_headers(columns) -> list:
+    """
+    Column headers of the InterOp imaging table, columns with children (e.g. one per channel)
+    are expanded to "<name> (<subname>)"
+    """
+    headers = []
+    for column in [columns[i] for i in range(columns.size())]:
+        name = column.name()
+        if column.has_children():
+            headers.extend([f"{name} ({subname})" for subname in column.subcolumns()])
+        else:
+            headers.append(name)
+    return headers
+
+
+def get_imaging_table(run_metrics) -> pd.DataFrame:
+    """
+    The InterOp imaging table (one row per lane, tile and cycle) as a DataFrame.
+    The values are filled by InterOp in a single call.
+    """
+    # Create the columns
+    columns = py_interop_table.imaging_column_vector()
+    py_interop_table.create_imaging_table_columns(run_metrics, columns)
+    headers = get_imaging_table_headers(columns)
+
+    column_count = py_interop_table.count_table_columns(columns)
+    row_offsets = py_interop_table.map_id_offset()
+    py_interop_table.count_table_rows(run_metrics, row_offsets)
+    data = np.zeros((row_offsets.size(), column_count), dtype=np.float32)
+    py_interop_table.populate_imaging_table_data(
+        run_metrics, columns, row_offsets, data.ravel()
+    )
+
+    return pd.DataFrame(data, columns=headers)
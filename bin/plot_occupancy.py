@@ -1,84 +1,124 @@
 #!/usr/bin/env python3
 
+import concurrent.futures
 import os
 import sys
+from itertools import repeat
 
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 import seaborn as sns
-from interop import py_interop_run_metrics, py_interop_run, py_interop_table
+from interop import py_interop_run_metrics, py_interop_run
 
+from imaging_table import get_imaging_table
 
-def plot_occupancy(run_folder: str, output_jpg_prefix="occupancy"):
+# Non-interactive backend, the plots are rendered in worker processes
+matplotlib.use("Agg")
+
+OCCUPIED_COLUMN = "% Occupied"
+PASS_FILTER_COLUMN = "% Pass Filter"
+# Hues with many distinct values are drawn as hexagonal bins instead of individual points
+HEXBIN_HUES = {"Tile", "Cycle"}
+HEXBIN_GRIDSIZE = 80
+# Upper limit of points drawn in the remaining scatter plots
+MAX_SCATTER_POINTS = 50_000
+
+
+def get_available_cpus() -> int:
+    """ CPUs this process may run on, which can be fewer than the host has """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def list_metrics_to_load(valid_to_load):
+    """ Flags the InterOp metrics needed for the plot """
+    valid_to_load[py_interop_run.ExtendedTile] = 1
+    valid_to_load[py_interop_run.Tile] = 1
+    valid_to_load[py_interop_run.Extraction] = 1
+
+
+def plot_occupancy(run_folder: str, output_jpg_prefix="occupancy", run_metrics=None, imaging_df=None, cpus=None):
     """
     To optimize loading concentrations on the NovaSeq platform, the % Occupied and % Pass Filter
     metrics can be plotted to determine if a run was underloaded, optimally loaded, or overloaded.
+    Already loaded InterOp metrics and their imaging table can be passed in with run_metrics and imaging_df.
+    The plots are rendered in up to cpus processes (by default the CPUs available to this process,
+    e.g. the task's cpus setting).
 
     More information:
     https://support.illumina.com/bulletins/2020/03/plotting---occupied-by---pass-filter-to-optimize-loading-concent.html
     """
 
-    # Initialize interop objects
-    run_metrics = py_interop_run_metrics.run_metrics()
-    valid_to_load = py_interop_run.uchar_vector(py_interop_run.MetricCount, 0)
-    valid_to_load[py_interop_run.ExtendedTile] = 1
-    valid_to_load[py_interop_run.Tile] = 1
-    valid_to_load[py_interop_run.Extraction] = 1
+    if imaging_df is None:
+        if run_metrics is None:
+            # Initialize interop objects
+            run_metrics = py_interop_run_metrics.run_metrics()
+            valid_to_load = py_interop_run.uchar_vector(py_interop_run.MetricCount, 0)
+            list_metrics_to_load(valid_to_load)
+
+            # Read from the run folder
+            run_metrics.read(run_folder, valid_to_load)
 
-    # Read from the run folder
-    run_metrics.read(run_folder, valid_to_load)
-
-    # Create the columns
-    columns = py_interop_table.imaging_column_vector()
-    py_interop_table.create_imaging_table_columns(run_metrics, columns)
-
-    headers = []
-    for i in range(columns.size()):
-        column = columns[i]
-        if column.has_children():
-            headers.extend(
-                [f"{column.name()} ({subname})" for subname in column.subcolumns()])
-        else:
-            headers.append(column.name())
-
-    column_count = py_interop_table.count_table_columns(columns)
-    row_offsets = py_interop_table.map_id_offset()
-    py_interop_table.count_table_rows(run_metrics, row_offsets)
-    data = np.zeros((row_offsets.size(), column_count), dtype=np.float32)
-    py_interop_table.populate_imaging_table_data(
-        run_metrics, columns, row_offsets, data.ravel()
-    )
-
-    # Make a DataFrame
-    df = pd.DataFrame(data, columns=headers)
+        # Make a DataFrame
+        imaging_df = get_imaging_table(run_metrics)
 
     # Skip if there is no data (% Occupied only available on NovaSeq)
-    if df.shape[0] == 0 or "% Occupied" not in df:
+    if imaging_df.shape[0] == 0 or OCCUPIED_COLUMN not in imaging_df:
         # Stop
         print("Occupancy plot skipped, no data available")
         return
 
-    x = "% Occupied"
-    y = "% Pass Filter"
     hues = ["Tile", "Lane", "Cycle"]
 
-    # Make a few different types of plots
-    for hue in hues:
+    # The plots are independent, render them in parallel when more than one CPU is available
+    plot_df = imaging_df[[OCCUPIED_COLUMN, PASS_FILTER_COLUMN, *hues]]
+    max_workers = min(len(hues), cpus or get_available_cpus())
+    if max_workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_save_occupancy_plot, repeat(plot_df), hues, repeat(output_jpg_prefix)))
+    else:
+        for hue in hues:
+            _save_occupancy_plot(plot_df, hue, output_jpg_prefix)
+
+
+def _save_occupancy_plot(df, hue: str, output_jpg_prefix: str):
+    """ Saves the % Occupied by % Pass Filter plot colored by one column """
+    x = OCCUPIED_COLUMN
+    y = PASS_FILTER_COLUMN
+
+    fig, ax = plt.subplots()
+    if hue in HEXBIN_HUES:
+        # Continuous values, average them per hexagon rather than drawing every point
+        hexbin = ax.hexbin(
+            df[x],
+            df[y],
+            C=df[hue],
+            reduce_C_function=np.mean,
+            gridsize=HEXBIN_GRIDSIZE,
+            extent=(0, 100, 0, 100),
+        )
+        fig.colorbar(hexbin, ax=ax, label=hue)
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+    else:
+        # Few discrete values, a random subset of the points shows the same picture
         sns.scatterplot(
-            data=df,
+            data=df.sample(min(len(df), MAX_SCATTER_POINTS), random_state=0),
             x=x,
             y=y,
             hue=hue,
             alpha=0.5,
             linewidth=0,
+            ax=ax,
         )
-        plt.xlim([0, 100])
-        plt.ylim([0, 100])
-        plt.legend(title=hue, bbox_to_anchor=[1.2, 0.9])
-        plt.tight_layout()
-        plt.savefig(f"{output_jpg_prefix}_{hue.lower()}.jpg", dpi=600)
-        plt.close()
+        ax.legend(title=hue, bbox_to_anchor=[1.2, 0.9])
+    ax.set_xlim([0, 100])
+    ax.set_ylim([0, 100])
+    fig.tight_layout()
+    fig.savefig(f"{output_jpg_prefix}_{hue.lower()}.jpg", dpi=600)
+    plt.close(fig)
 
 
 # If this file is being run as a standalone script
@@ -89,4 +129,7 @@ if __name__ == "__main__":
     input_path = sys.argv[1]
     assert os.path.exists(input_path), f"Input path must exist ({input_path})"
 
-    plot_occupancy(input_path)
+    # Optional number of CPUs to use for the plots
+    cpus = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    plot_occupancy(input_path, cpus=cpus)
@@ -5,57 +5,78 @@ import os
 import sys
 
 import matplotlib.pyplot as plt
+import numpy as np
 from interop import py_interop_run_metrics, py_interop_run, py_interop_plot
 
 logger = logging.getLogger(__name__)
 
+# InterOp metric plotted by cycle
+PLOT_METRIC = "BasePercent"
 
-def plot_percent_base(run_folder: str, output_svg="percent_base.svg"):
+
+def list_metrics_to_load(valid_to_load):
+    """ Flags only the InterOp metrics needed for the plot, the summary metrics are loaded by run_summary.py """
+    py_interop_run_metrics.list_metrics_to_load(PLOT_METRIC, valid_to_load)
+
+
+def plot_percent_base(run_folder: str, output_svg="percent_base.svg", run_metrics=None):
     """
     Plots the base % across each cycle. Each line represents a different base.
     Reference lines are added for each read.
+    Already loaded InterOp metrics can be passed in with run_metrics.
 
     Base %: The percentage of clusters for which the selected base (A, C, T, or G) has been called.
     """
-    # Initialize interop objects
-    run_metrics = py_interop_run_metrics.run_metrics()
-    valid_to_load = py_interop_run.uchar_vector(py_interop_run.MetricCount, 0)
-    py_interop_run_metrics.list_summary_metrics_to_load(valid_to_load)
+    if run_metrics is None:
+        # Initialize interop objects
+        run_metrics = py_interop_run_metrics.run_metrics()
+        valid_to_load = py_interop_run.uchar_vector(py_interop_run.MetricCount, 0)
+        list_metrics_to_load(valid_to_load)
 
-    # Read from the run folder
-    run_metrics.read(run_folder, valid_to_load)
+        # Read from the run folder
+        run_metrics.read(run_folder, valid_to_load)
 
     logger.info('Generating % base plot')
     plot_data = py_interop_plot.candle_stick_plot_data()
     options = py_interop_plot.filter_options(run_metrics.run_info().flowcell().naming_method())
-    py_interop_plot.plot_by_cycle(run_metrics, "BasePercent", options, plot_data)
+    py_interop_plot.plot_by_cycle(run_metrics, PLOT_METRIC, options, plot_data)
+
+    fig, ax = plt.subplots()
 
     # Plot each base
     for base_index in range(plot_data.size()):
         line_data = plot_data.at(base_index)
-        x = [line_data.at(i).x() for i in range(line_data.size())]
-        y = [line_data.at(i).y() for i in range(line_data.size())]
-        plt.plot(x, y, color=line_data.color(), linewidth=0.5, label=line_data.title())
+
+        # Fetch each point once and store x/y side by side
+        n = line_data.size()
+        xy = np.empty((n, 2), dtype=np.float64)
+        for i in range(n):
+            point = line_data.at(i)
+            xy[i, 0] = point.x()
+            xy[i, 1] = point.y()
+
+        ax.plot(xy[:, 0], xy[:, 1], color=line_data.color(), linewidth=0.5, label=line_data.title())
 
     # Plot reference lines for reads
     read_vector = run_metrics.run_info().reads()
     for read_index in range(read_vector.size()):
         read_name = f'R{read_vector[read_index].number()}'
         cycle_start = read_vector[read_index].first_cycle()
-        plt.axvline(x=cycle_start, color='purple', linestyle='--', linewidth=0.35)
-        plt.text(cycle_start, plt.gca().get_ylim()[1], read_name, fontsize=8, color='purple')
+        ax.axvline(x=cycle_start, color='purple', linestyle='--', linewidth=0.35)
+        ax.text(cycle_start, ax.get_ylim()[1], read_name, fontsize=8, color='purple')
 
     # Plot settings
     axes_data = plot_data.xyaxes()
-    plt.xlabel(axes_data.x().label(), fontsize=10)
-    plt.ylabel(axes_data.y().label(), fontsize=10)
-    plt.title(plot_data.title(), fontsize=10)
-    plt.legend()
-    plt.ylim([axes_data.y().min(), axes_data.y().max()])
-    plt.xlim([axes_data.x().min(), axes_data.x().max()])
+    ax.set_xlabel(axes_data.x().label(), fontsize=10)
+    ax.set_ylabel(axes_data.y().label(), fontsize=10)
+    ax.set_title(plot_data.title(), fontsize=10)
+    ax.legend()
+    ax.set_ylim([axes_data.y().min(), axes_data.y().max()])
+    ax.set_xlim([axes_data.x().min(), axes_data.x().max()])
 
     # Save figure
-    plt.savefig(output_svg)
+    fig.savefig(output_svg)
+    plt.close(fig)
 
 
 # If this file is being run as a standalone script
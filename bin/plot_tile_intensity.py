@@ -1,90 +1,133 @@
 #!/usr/bin/env python3
 
+import logging
 import os
 import sys
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import seaborn as sns
 from interop import py_interop_run_metrics, py_interop_run
 
-
-def plot_tile_intensity(run_folder: str, output_svg_prefix='max_intensity'):
-
-    # Initialize interop objects
-    run_metrics = py_interop_run_metrics.run_metrics()
-    valid_to_load = py_interop_run.uchar_vector(py_interop_run.MetricCount, 0)
-    valid_to_load[py_interop_run.Extraction] = 1
-
-    # Read from the run folder
-    run_metrics.read(run_folder, valid_to_load)
-
-    # Get the extraction metrics
+from imaging_table import get_imaging_table
+
+logger = logging.getLogger(__name__)
+
+# InterOp reports the extraction max intensity as the P90 imaging column (one sub-column per channel)
+MAX_INTENSITY_COLUMN = "P90"
+
+
+def _get_imaging_table_intensity(imaging_df):
+    """
+    Max intensity per lane, tile, cycle and channel, taken from the imaging table that InterOp fills in C.
+    Returns None when this InterOp version does not provide the max intensity column.
+    """
+    intensity_prefix = f"{MAX_INTENSITY_COLUMN} ("
+    channels = {
+        header: header[len(intensity_prefix):-1]
+        for header in imaging_df.columns
+        if header.startswith(intensity_prefix)
+    }
+    if not channels:
+        return None
+
+    df = imaging_df[["Lane", "Tile", "Cycle", *channels]].rename(
+        columns={"Lane": "lane", "Tile": "tile", "Cycle": "cycle", **channels}
+    ).melt(
+        id_vars=["lane", "tile", "cycle"],
+        var_name="channel",
+        value_name="max_intensity",
+    ).dropna(subset=["max_intensity"])
+    return df.astype({"lane": int, "tile": int, "cycle": int})
+
+
+def _get_extraction_metric_intensity(run_metrics):
+    """
+    Max intensity per lane, tile, cycle and channel, read from the extraction metrics one record at a time.
+    Fallback for InterOp versions without the max intensity imaging column.
+    """
     extraction_metrics = run_metrics.extraction_metric_set()
-    extraction_metrics.rebuild_index(True)
-
-    # Format a DataFrame
-    df = []
-    for lane in extraction_metrics.lanes():
-
-        print(f"Processing lane {lane}")
-
-        for tile in extraction_metrics.tile_numbers_for_lane(lane):
-
-            if not isinstance(tile, int):
-                continue
-            
-            print(f"Processing tile {tile}")
-
-            for cycle in range(extraction_metrics.max_cycle()):
-
-                print(f"Processing cycle {cycle}")
-
-                try:
+    metric_count = extraction_metrics.size()
+    channel_count = extraction_metrics.channel_count()
+
+    # Single pass over the records, filling one array per field
+    lanes = np.empty(metric_count, dtype=np.int64)
+    tiles = np.empty(metric_count, dtype=np.int64)
+    cycles = np.empty(metric_count, dtype=np.int64)
+    intensity = np.empty((metric_count, channel_count), dtype=np.float32)
+    for i in range(metric_count):
+        extraction_metric = extraction_metrics.at(i)
+        lanes[i] = extraction_metric.lane()
+        tiles[i] = extraction_metric.tile()
+        cycles[i] = extraction_metric.cycle()
+        for channel in range(channel_count):
+            intensity[i, channel] = extraction_metric.max_intensity(channel)
+
+    channel_names = run_metrics.run_info().channels()
+    return pd.DataFrame({
+        "lane": np.repeat(lanes, channel_count),
+        "tile": np.repeat(tiles, channel_count),
+        "cycle": np.repeat(cycles, channel_count),
+        "channel": np.tile([channel_names[channel] for channel in range(channel_count)], metric_count),
+        "max_intensity": intensity.ravel(),
+    })
+
+
+def list_metrics_to_load(valid_to_load):
+    """ Flags the InterOp metrics needed for the plot """
+    valid_to_load[py_interop_run.Extraction] = 1
 
-                    extraction_metric = extraction_metrics.get_metric(
-                        lane,
-                        tile,
-                        cycle
-                    )
 
-                except:
+def plot_tile_intensity(run_folder: str, output_svg_prefix='max_intensity', run_metrics=None, imaging_df=None):
+    """
+    Plots the max intensity over cycles, one plot per lane.
+    Already loaded InterOp metrics and their imaging table can be passed in with run_metrics and imaging_df.
+    """
+    if run_metrics is None:
+        # Initialize interop objects
+        run_metrics = py_interop_run_metrics.run_metrics()
+        valid_to_load = py_interop_run.uchar_vector(py_interop_run.MetricCount, 0)
+        list_metrics_to_load(valid_to_load)
 
-                    continue
+        # Read from the run folder
+        run_metrics.read(run_folder, valid_to_load)
 
-                for channel in range(extraction_metrics.channel_count()):
+    if imaging_df is None:
+        imaging_df = get_imaging_table(run_metrics)
 
-                    df.append(dict(
-                        channel=channel,
-                        lane=lane,
-                        tile=tile,
-                        cycle=cycle,
-                        max_intensity=extraction_metric.max_intensity(channel)
-                    ))
-        
-    df = pd.DataFrame(df)
+    # Format a DataFrame with one row per lane, tile, cycle and channel
+    df = _get_imaging_table_intensity(imaging_df)
+    if df is None:
+        df = _get_extraction_metric_intensity(run_metrics)
 
     # Iterate over lanes
     for lane, lane_df in df.groupby('lane'):
 
+        logger.info(f"Processing lane {lane}: {lane_df['tile'].nunique()} tiles x {lane_df['cycle'].nunique()} cycles")
+
         # Plot the change in max intensity over cycles
+        fig, ax = plt.subplots()
         sns.lineplot(
             data=lane_df,
             x='cycle',
             y='max_intensity',
+            ax=ax,
         )
 
         # Set a title
-        plt.title(f"Lane {lane}")
+        ax.set_title(f"Lane {lane}")
 
         # Save to the PDF
-        plt.savefig(f"{output_svg_prefix}_{lane}.svg")
-        plt.close()
+        fig.savefig(f"{output_svg_prefix}_{lane}.svg")
+        plt.close(fig)
 
 
 # If this file is being run as a standalone script
 if __name__ == "__main__":
 
+    logging.basicConfig(level=logging.INFO)
+
     # Get the input file path from the first argument
     assert len(sys.argv) > 1, "Please provide input path"
     input_path = sys.argv[1]
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import logging
+import os
+import sys
+
+from interop import py_interop_run_metrics, py_interop_run
+
+import plot_occupancy
+import plot_percent_base
+import plot_tile_intensity
+import run_summary
+from imaging_table import get_imaging_table
+
+logger = logging.getLogger(__name__)
+
+# Every output produced from the run folder, with the InterOp metrics each one needs
+OUTPUT_MODULES = [run_summary, plot_percent_base, plot_tile_intensity, plot_occupancy]
+
+
+def run_all(run_folder: str, cpus=None):
+    """
+    Produces the run summary tables and all plots, reading the InterOp files only once.
+    cpus limits the processes used for the plots, by default the CPUs available to this process.
+    """
+    # Initialize interop objects with the metrics needed by any of the outputs
+    run_metrics = py_interop_run_metrics.run_metrics()
+    valid_to_load = py_interop_run.uchar_vector(py_interop_run.MetricCount, 0)
+    for module in OUTPUT_MODULES:
+        module.list_metrics_to_load(valid_to_load)
+
+    # Read from the run folder
+    run_metrics.read(run_folder, valid_to_load)
+
+    # The imaging table covers every loaded metric, build it once for both plots that use it
+    imaging_df = get_imaging_table(run_metrics)
+
+    run_summary.write_run_stats(run_folder, run_metrics=run_metrics)
+    plot_percent_base.plot_percent_base(run_folder, run_metrics=run_metrics)
+    plot_tile_intensity.plot_tile_intensity(run_folder, run_metrics=run_metrics, imaging_df=imaging_df)
+    plot_occupancy.plot_occupancy(run_folder, run_metrics=run_metrics, imaging_df=imaging_df, cpus=cpus)
+
+
+# If this file is being run as a standalone script
+if __name__ == "__main__":
+
+    logging.basicConfig(level=logging.INFO)
+
+    # Get the input file path from the first argument
+    assert len(sys.argv) > 1, "Please provide input path"
+    input_path = sys.argv[1]
+    assert os.path.exists(input_path), f"Input path must exist ({input_path})"
+
+    # Optional number of CPUs allocated to the task
+    cpus = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    run_all(input_path, cpus=cpus)
@@ -1,77 +1,33 @@
 #!/usr/bin/env python3
+import glob
+import hashlib
+import html
+import io
 import json
 import logging
-import math
 import os
 import sys
-from typing import Union, List
+import tempfile
+from functools import cached_property, lru_cache
+from typing import List, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 from interop import py_interop_run_metrics, py_interop_run, py_interop_summary
 
-logger = logging.getLogger(__name__)
-
-
-class ColumnDef:
-    """
-     Represents a data value from the Illumina InterOp output
-    """
-    def __init__(self, name: str, field: Union[str, List[str]], **kwargs):
-        self.name = name
-
-        # Allow multiple fields in one 'cell'
-        if isinstance(field, str):
-            self.fields = [field]
-        else:
-            self.fields = field
-
-        # Default precision and scale to 2 and 1, respectively
-        self.precision = kwargs.get('precision', 2)
-        self.scale = kwargs.get('scale', 1)
-
-    def get_value_from_row(self, row) -> str:
-        """
-        The attributes are a proxy of the c implementation, the values are actually a method getter
-        This method works with values that have mean/std deviations, ranges, and multiple values
-        """
-
-        if len(self.fields) > 1:
-            # Special case where there are multiple fields
-            values = []
-            for field in self.fields:
-                values.append(str(self._format(getattr(row, field)().mean())))
-            return ' / '.join(values)
-
-        value_method = getattr(row, self.fields[0])
-        if value_method is None:
-            return 'N/A'
-
-        value = value_method()
-
-        if hasattr(value, 'mean'):
-            # Special case when the value has a mean, add standard deviation
-            return f'{self._format(value.mean())} +/- {self._format(value.stddev())}'
-        elif hasattr(value, 'error_cycle_range'):
-            # Special case when there is a cycle range
-            error_range = value.error_cycle_range()
-            first = error_range.first_cycle()
-            last = error_range.last_cycle()
-            if first == last:
-                return self._format(first)
-            return f'{self._format(first)} - {self._format(last)}'
+from column_def import ColumnDef, render_value
 
-        return self._format(value)
-
-    def _format(self, value):
-        value = value / self.scale
-
-        if not math.isnan(value):
-            value = round(value, self.precision)
-        return value
+try:
+    # Faster JSON encoding when available, the standard library json module is used otherwise
+    import orjson
+except ImportError:
+    orjson = None
 
+logger = logging.getLogger(__name__)
 
-# Metrics summarized by read
-RUN_SUMMARY_COLUMNS = [
+# Metrics summarized by read. The column definitions are shared by every RunSummary,
+# each one caches the extractors for the InterOp row types it has seen.
+RUN_SUMMARY_COLUMNS = (
     # Number of bases sequenced
     ColumnDef('Yield Total (G)', 'yield_g'),
     # Projected number of bases expected to be sequenced
@@ -85,11 +41,11 @@ RUN_SUMMARY_COLUMNS = [
     # % of bases with a quality score of 30 or higher
     ColumnDef('% >= Q30', 'percent_gt_q30'),
     # % of clusters that can be sequenced
-    ColumnDef('% Occupied', 'percent_occupied')
-]
+    ColumnDef('% Occupied', 'percent_occupied'),
+)
 
-# Metrics summarized by lane
-READ_SUMMARY_COLUMNS = [
+# Metrics summarized by lane, shared by every RunSummary like the run summary columns
+READ_SUMMARY_COLUMNS = (
     ColumnDef('Lane', 'lane', precision=None),
     # Number of tiles per lane
     ColumnDef('Tiles', 'tile_count', precision=None),
@@ -120,7 +76,7 @@ READ_SUMMARY_COLUMNS = [
     ColumnDef('Error (100)', 'error_rate_100'),
     ColumnDef('Intensity C1', 'first_cycle_intensity', precision=None),
     ColumnDef('% Occupied', 'percent_occupied'),
-]
+)
 
 
 SAV_TABLE_STYLE = """
@@ -137,77 +93,360 @@ SAV_TABLE_STYLE = """
 </style>
 """
 
+# Layout of the HTML run stats, filled in with one substitution per page and per read table
+# The run stats page is the run table followed by one table per read, joined in one go
+RUN_TABLE_HTML_TEMPLATE = """
+          {style}
+          <strong>Run Quality Summary</strong>
+          {run_table}
+          """
+
+READ_TABLE_HTML_TEMPLATE = """
+              <br>
+              <strong>Read {read_number}</strong>
+              {table}
+              """
+
+RUN_STATS_HTML_END = """
+          """
+
+# Summary tables, laid out as pandas DataFrame.to_html writes them
+HTML_TABLE_TAG = '<table border="0" class="dataframe sav-table">'
+HTML_TABLE_START = HTML_TABLE_TAG + """
+  <thead>
+    <tr style="text-align: right;">
+{header_cells}    </tr>
+  </thead>
+  <tbody>
+"""
+HTML_ROW_START = """    <tr>
+"""
+HTML_ROW_END = """    </tr>
+"""
+HTML_TABLE_END = """  </tbody>
+</table>"""
+
+# Name of the folder inside the run folder where the result tables are cached
+CACHE_DIR_NAME = '.interop_cache'
+# Part of the run folder key, bump it whenever the tables or the cache file layout change
+CACHE_FORMAT_VERSION = 2
+
+# Files written by the standalone script
+JSON_OUTPUT = 'run_metrics.json'
+HTML_OUTPUT = 'run_metrics.html'
+# Sidecar holding the key of the run folder the outputs were generated from
+OUTPUT_KEY_FILE = '.interop_cache.key'
+
+
+def get_run_folder_key(run_folder_path: str) -> str:
+    """
+    Fingerprint of the run folder inputs, changes whenever RunInfo.xml, RunParameters.xml
+    or any of the InterOp binary files are added, removed or modified, or when the table format changes.
+    The files are identified by their resolved paths, so links to the same inputs (as staged by Nextflow)
+    give the same key.
+    """
+    paths = [os.path.join(run_folder_path, 'RunInfo.xml'), os.path.join(run_folder_path, 'RunParameters.xml')]
+    paths += sorted(glob.glob(os.path.join(run_folder_path, 'InterOp', '*.bin')))
+
+    key = hashlib.sha1(f'{CACHE_FORMAT_VERSION};'.encode())
+    for path in paths:
+        key.update(f'{os.path.realpath(path)};'.encode())
+        if os.path.exists(path):
+            stat = os.stat(path)
+            key.update(f'{stat.st_mtime_ns}:{stat.st_size};'.encode())
+    return key.hexdigest()
+
+
+def list_metrics_to_load(valid_to_load):
+    """ Flags the InterOp metrics needed for the run summary tables """
+    py_interop_run_metrics.list_summary_metrics_to_load(valid_to_load)
+
+
+@lru_cache(maxsize=None)
+def _get_valid_to_load():
+    """ Flags of the metrics to read for the run summary, built once and shared by every RunSummary """
+    valid_to_load = py_interop_run.uchar_vector(py_interop_run.MetricCount, 0)
+    list_metrics_to_load(valid_to_load)
+    return valid_to_load
+
+
+def outputs_are_current(output_paths: List[str], run_folder_key: str) -> bool:
+    """
+    True when all outputs exist and were generated from a run folder with the given key,
+    as recorded in the OUTPUT_KEY_FILE sidecar
+    """
+    if not all(os.path.exists(path) for path in output_paths + [OUTPUT_KEY_FILE]):
+        return False
+    with open(OUTPUT_KEY_FILE, 'rt') as handle_in:
+        return handle_in.read().strip() == run_folder_key
+
+
+def _render_table(df: pd.DataFrame, columns: Sequence[ColumnDef]) -> pd.DataFrame:
+    """ Copy of a table with the composite values (mean +/- stddev, ranges, ...) turned into text """
+    df = df.copy()
+    for column in columns:
+        if df[column.name].dtype == object:
+            df[column.name] = df[column.name].map(render_value)
+    return df
+
+
+def _to_html(df: pd.DataFrame, columns: Sequence[ColumnDef]) -> str:
+    """
+    Same HTML table as DataFrame.to_html(index=False, border=0, classes=['sav-table']), written directly
+    from the column arrays. Falls back to pandas for values it does not format the same way.
+    """
+    df = _render_table(df, columns)
+    column_texts = [_format_html_column(df[name].to_numpy()) for name in df.columns]
+    if not len(df) or any(texts is None for texts in column_texts):
+        return _to_pandas_html(df)
+
+    parts = [_get_html_table_head(tuple(df.columns))]
+    for row_texts in zip(*column_texts):
+        parts.append(HTML_ROW_START)
+        parts.extend(f'      <td>{text}</td>\n' for text in row_texts)
+        parts.append(HTML_ROW_END)
+    parts.append(HTML_TABLE_END)
+    return ''.join(parts)
+
+
+def _to_pandas_html(df: pd.DataFrame) -> str:
+    """
+    HTML table of a rendered table written by pandas, starting with the same table tag as the tables written
+    directly (newer pandas versions leave out the border attribute)
+    """
+    table_html = df.to_html(index=False, border=0, classes=['sav-table'])
+    return HTML_TABLE_TAG + table_html[table_html.index('>') + 1:]
+
+
+@lru_cache(maxsize=None)
+def _get_html_table_head(names: tuple) -> str:
+    """ Start of the table up to the first row, the same for every table with these columns """
+    header_cells = ''.join(f'      <th>{html.escape(name, quote=False)}</th>\n' for name in names)
+    return HTML_TABLE_START.format(header_cells=header_cells)
+
+
+def _format_html_column(values: np.ndarray) -> Optional[List[str]]:
+    """
+    Cell texts of a column as pandas displays them, None when it is not one of the simple cases.
+    The values are known to be numbers or plain text (rendered composite values), so they are not escaped.
+    """
+    if values.dtype.kind in 'iu':
+        return [str(value) for value in values.tolist()]
+    elif values.dtype.kind == 'f':
+        return _format_html_float_column(values)
+    elif values.dtype == object and all(isinstance(value, (str, int)) for value in values.tolist()):
+        return [str(value) for value in values.tolist()]
+    return None
+
+
+def _format_html_float_column(values: np.ndarray) -> Optional[List[str]]:
+    """
+    Floats use the same number of decimals for the whole column (at least one, at most 6), NaN is shown as NaN.
+    Very large or very small values are left to pandas, which switches to scientific notation for those.
+    """
+    is_nan = np.isnan(values)
+    numbers = np.abs(values[~is_nan])
+    if not np.isfinite(numbers).all() or (numbers >= 1E6).any() or ((numbers < 1E-6) & (numbers > 0)).any():
+        return None
+
+    texts = [f'{value:.6f}'.rstrip('0') for value in numbers.tolist()]
+    decimals = max([len(text) - text.index('.') - 1 for text in texts] + [1])
+    return ['NaN' if nan else f'{value:.{decimals}f}' for value, nan in zip(values.tolist(), is_nan.tolist())]
+
+
+def _to_records(df: pd.DataFrame, columns: Sequence[ColumnDef]) -> List[dict]:
+    """ Table rows as dictionaries, with missing values as None so they are written as JSON null """
+    df = _render_table(df, columns)
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def _write_json(data, handle_out):
+    """
+    Writes indented JSON to a file opened in binary mode. orjson writes its encoded bytes as they are,
+    otherwise json.dump streams the text through a wrapper that is detached (and flushed) afterwards.
+    """
+    if orjson is not None:
+        handle_out.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+
+    text_out = io.TextIOWrapper(handle_out, encoding='utf-8')
+    try:
+        json.dump(data, text_out, indent=2, allow_nan=False)
+    finally:
+        text_out.detach()
+
 
 class RunSummary:
     """
     The run summary class provides tables with basic data quality metrics summarized per lane and per read.
     """
-    def __init__(self, run_folder_path):
-        # Initialize interop objects
-        self.run_metrics = py_interop_run_metrics.run_metrics()
-        valid_to_load = py_interop_run.uchar_vector(py_interop_run.MetricCount, 0)
-        py_interop_run_metrics.list_summary_metrics_to_load(valid_to_load)
-
-        # Read from run folder
-        self.run_metrics.read(run_folder_path, valid_to_load)
+    def __init__(self, run_folder_path, cache_dir: Optional[str] = None, run_metrics=None):
+        self.run_folder_path = run_folder_path
+
+        # InterOp objects, only read from the run folder when a table has to be built
+        # (unless already loaded metrics, including the summary metrics, are passed in)
+        self.run_metrics = run_metrics
+        self._summary = None
+        self._n_reads = None
+        self._n_lanes = None
+        self._read_display_names = None
+
+        # Cached result tables for subsequent calls (the run table is cached by the run_summary property)
+        self.read_summary_dfs = {}
+        # Rendered forms of the result tables, HTML fragments and JSON records
+        self._run_html = None
+        self._read_html = {}
+        self._run_records = None
+        self._read_records = {}
+
+        # Rendered tables can be persisted between runs on the same (unchanged) run folder
+        self.cache_path = None
+        if cache_dir is not None:
+            self.cache_path = os.path.join(cache_dir, f'{get_run_folder_key(run_folder_path)}.json')
+            if not self._read_cache():
+                self._write_cache()
+
+    @property
+    def summary(self):
+        """ InterOp run summary, the summary metrics are read on first access """
+        if self._summary is None:
+            self._load_summary_metrics()
+        return self._summary
+
+    @property
+    def read_count(self) -> int:
+        if self._n_reads is None:
+            self._n_reads = int(self.summary.size())
+        return self._n_reads
+
+    @property
+    def lane_count(self) -> int:
+        if self._n_lanes is None:
+            self._n_lanes = int(self.summary.lane_count())
+        return self._n_lanes
+
+    def _load_summary_metrics(self):
+        if self.run_metrics is None:
+            # Initialize interop objects
+            self.run_metrics = py_interop_run_metrics.run_metrics()
+            # Read from run folder
+            self.run_metrics.read(self.run_folder_path, _get_valid_to_load())
 
         # Load up summary metrics
-        self.summary = py_interop_summary.run_summary()
-        py_interop_summary.summarize_run_metrics(self.run_metrics, self.summary)
+        self._summary = py_interop_summary.run_summary()
+        py_interop_summary.summarize_run_metrics(self.run_metrics, self._summary)
 
-        # Cached result tables for subsequent calls
-        self.run_summary_df = None
-        self.read_summary_dfs = {}
+    def _read_cache(self) -> bool:
+        """
+        Restores the rendered tables (JSON records and HTML) from the cache file, returns False when
+        there is no usable cache file. The DataFrames are only rebuilt from the run folder when asked for.
+        """
+        if not os.path.exists(self.cache_path):
+            return False
+
+        logger.info(f'Loading run summary tables from {self.cache_path}')
+        try:
+            with open(self.cache_path, 'rt') as handle_in:
+                cached = json.load(handle_in)
+            run_records, read_records = cached['runSummary'], cached['reads']
+            run_html, read_html = cached['runHtml'], cached['readsHtml']
+            if len(read_records) != len(read_html):
+                raise ValueError('read tables do not match')
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # A damaged cache file is rebuilt (and replaced) like a missing one
+            logger.warning(f'Ignoring unreadable run summary cache {self.cache_path}: {e}')
+            return False
+
+        self._run_records = run_records
+        self._read_records = dict(enumerate(read_records))
+        self._run_html = run_html
+        self._read_html = dict(enumerate(read_html))
+        self._n_reads = len(read_records)
+        return True
+
+    def _write_cache(self):
+        """ Renders every table and stores them in the cache file, replaced in one go so it is never partial """
+        cached = {
+            'runSummary': self._get_run_records(),
+            'reads': [self._get_read_records(read_num) for read_num in range(self.read_count)],
+            'runHtml': self._get_run_html(),
+            'readsHtml': [self._get_read_html(read_num) for read_num in range(self.read_count)],
+        }
+        cache_dir = os.path.dirname(self.cache_path)
+        temp_path = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile('wt', dir=cache_dir, suffix='.tmp', delete=False) as handle_out:
+                temp_path = handle_out.name
+                json.dump(cached, handle_out, allow_nan=False)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            # The cache only saves time on reruns, never fail the summary because of it
+            logger.warning(f'Unable to write run summary cache {self.cache_path}: {e}')
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
 
     def get_table_html(self) -> str:
         logger.info('Generating run stats html')
-        read_tables = ''.join([
-            f"""
-              <br>
-              <strong>Read {read_num + 1}</strong>
-              {self.get_read_summary(read_num).to_html(index=False, border=0, classes=['sav-table'])}
-              """
-            for read_num in range(0, self.summary.size())
-        ])
-        return f"""
-          {SAV_TABLE_STYLE}
-          <strong>Run Quality Summary</strong>
-          {self.get_run_summary().to_html(index=False, border=0, classes=['sav-table'])}
-          {read_tables}
-          """
+        parts = [RUN_TABLE_HTML_TEMPLATE.format(style=SAV_TABLE_STYLE, run_table=self._get_run_html())]
+        parts.extend(READ_TABLE_HTML_TEMPLATE.format(read_number=read_num + 1, table=self._get_read_html(read_num))
+                     for read_num in range(self.read_count))
+        parts.append(RUN_STATS_HTML_END)
+        return ''.join(parts)
 
     def get_table_json(self) -> str:
         logger.info('Generating run stats json')
-        summary_data = {
-            'runSummary': self.get_run_summary().to_dict('records'),
-            'reads': [
-                self.get_read_summary(read_num).to_dict('records')
-                for read_num in range(0, self.summary.size())
-            ]
+        buffer = io.BytesIO()
+        _write_json(self._get_summary_data(), buffer)
+        return buffer.getvalue().decode()
+
+    def write_table_json(self, handle_out):
+        """ Writes the JSON tables straight to a file opened in binary mode, without building a string first """
+        logger.info('Writing run stats json')
+        _write_json(self._get_summary_data(), handle_out)
+
+    def _get_summary_data(self) -> dict:
+        return {
+            'runSummary': self._get_run_records(),
+            'reads': [self._get_read_records(read_num) for read_num in range(self.read_count)]
         }
-        json_output = json.dumps(summary_data, indent=2)
-        # Look into using third party JSON library if need more formatting options
-        json_output = json_output.replace('NaN', 'null')
-        return json_output
+
+    def _get_run_html(self) -> str:
+        if self._run_html is None:
+            self._run_html = _to_html(self.run_summary, RUN_SUMMARY_COLUMNS)
+        return self._run_html
+
+    def _get_read_html(self, read_num: int) -> str:
+        if read_num not in self._read_html:
+            self._read_html[read_num] = _to_html(self.get_read_summary(read_num), READ_SUMMARY_COLUMNS)
+        return self._read_html[read_num]
+
+    def _get_run_records(self) -> List[dict]:
+        if self._run_records is None:
+            self._run_records = _to_records(self.run_summary, RUN_SUMMARY_COLUMNS)
+        return self._run_records
+
+    def _get_read_records(self, read_num: int) -> List[dict]:
+        if read_num not in self._read_records:
+            self._read_records[read_num] = _to_records(self.get_read_summary(read_num), READ_SUMMARY_COLUMNS)
+        return self._read_records[read_num]
 
     def get_run_summary(self) -> pd.DataFrame:
         """ Summarized per read """
-        if self.run_summary_df is not None:
-            return self.run_summary_df
-
-        rows = [(self._get_read_display_name(read_num), self.summary.at(read_num).summary())
-                for read_num in range(0, self.summary.size())]
+        return self.run_summary
+
+    @cached_property
+    def run_summary(self) -> pd.DataFrame:
+        """ Summarized per read, built on first access """
+        read_summary_at = self.summary.at
+        rows = [(read_display_name, read_summary_at(read_num).summary())
+                for read_num, read_display_name in enumerate(self._get_read_display_names())]
         rows += [('Non-Indexed Total', self.summary.nonindex_summary()), ('Total', self.summary.total_summary())]
 
-        data = {}
-        for column in RUN_SUMMARY_COLUMNS:
-            data[column.name] = pd.Series([column.get_value_from_row(row[1]) for row in rows],
-                                          index=[row[0] for row in rows])
-        df = pd.DataFrame.from_dict(data)
+        df = self._create_table([row[1] for row in rows], RUN_SUMMARY_COLUMNS, index=[row[0] for row in rows])
         df.index.name = 'Level'
         df.reset_index(inplace=True)
-        self.run_summary_df = df
-        return self.run_summary_df
+        return df
 
     def get_read_summary(self, read_num: int) -> pd.DataFrame:
         """
@@ -219,21 +458,68 @@ class RunSummary:
 
         if read_num < 0:
             raise RuntimeError("Read number must be greater or equal to 0")
-        if read_num > self.summary.size():
+        if read_num >= self.read_count:
             raise RuntimeError("Read number is greater than available reads")
-        rows = [self.summary.at(read_num).at(lane) for lane in range(0, self.summary.lane_count())]
+        lane_summary_at = self.summary.at(read_num).at
+        rows = [lane_summary_at(lane) for lane in range(self.lane_count)]
 
-        data = {}
-        for column in READ_SUMMARY_COLUMNS:
-            data[column.name] = pd.Series([column.get_value_from_row(row) for row in rows])
-        self.read_summary_dfs[read_num] = pd.DataFrame.from_dict(data)
+        self.read_summary_dfs[read_num] = self._create_table(rows, READ_SUMMARY_COLUMNS)
         return self.read_summary_dfs[read_num]
 
-    def _get_read_display_name(self, index: int) -> str:
-        """ Adds the (I) flag for indexed reads """
-        read_number = self.summary.at(index).read().number()
-        indexed_flag = "(I) " if self.summary.at(index).read().is_index() else ""
-        return "Read {}{}".format(indexed_flag, read_number)
+    @staticmethod
+    def _create_table(rows, columns: Sequence[ColumnDef], index=None) -> pd.DataFrame:
+        """
+        Reads all the columns of a row in a single pass over the rows, then formats
+        each column as one array and wraps them in a single DataFrame
+        """
+        if not rows:
+            return pd.DataFrame({column.name: np.empty(0) for column in columns}, index=index)
+
+        extractors = [column.get_raw_extractor(rows[0]) for column in columns]
+        raw_columns = [[] for _ in columns]
+        for row in rows:
+            for extract_raw, raw_values in zip(extractors, raw_columns):
+                raw_values.append(extract_raw(row))
+
+        # The column arrays are freshly built, no need for pandas to copy them again
+        return pd.DataFrame({column.name: column.format_raw_column(raw_values, rows[0])
+                             for column, raw_values in zip(columns, raw_columns)}, index=index, copy=False)
+
+    def _get_read_display_names(self) -> List[str]:
+        """ Display names of all the reads, looked up once. Adds the (I) flag for indexed reads """
+        if self._read_display_names is None:
+            read_summary_at = self.summary.at
+            reads = [read_summary_at(index).read() for index in range(self.read_count)]
+            self._read_display_names = [f"Read {'(I) ' if read.is_index() else ''}{read.number()}" for read in reads]
+        return self._read_display_names
+
+
+def write_run_stats(run_folder_path: str, run_metrics=None, cache_dir: Optional[str] = None):
+    """
+    Writes the run summary tables to run_metrics.json and run_metrics.html in the working directory.
+    Already loaded InterOp metrics can be passed in to avoid reading the run folder again,
+    or the rendered tables can be reused from a cache directory when the inputs are unchanged.
+    """
+    # Skip everything when the outputs were already written for the same inputs
+    run_folder_key = get_run_folder_key(run_folder_path)
+    if outputs_are_current([JSON_OUTPUT, HTML_OUTPUT], run_folder_key):
+        logger.info('Run stats are up to date, nothing to do')
+        return
+
+    # Parse the inputs, reusing the tables from a previous run on the same inputs
+    summary = RunSummary(run_folder_path, cache_dir=cache_dir, run_metrics=run_metrics)
+
+    # Extract the JSON summary
+    with open(JSON_OUTPUT, 'wb') as handle_out:
+        summary.write_table_json(handle_out)
+
+    table_html = summary.get_table_html()
+    with open(HTML_OUTPUT, 'wt') as handle_out:
+        handle_out.write(table_html)
+
+    # Record which inputs the outputs were generated from
+    with open(OUTPUT_KEY_FILE, 'wt') as handle_out:
+        handle_out.write(run_folder_key)
 
 
 # If this file is being run as a standalone script
@@ -244,14 +530,5 @@ if __name__ == "__main__":
     input_path = sys.argv[1]
     assert os.path.exists(input_path), f"Input path must exist ({input_path})"
 
-    # Parse the inputs
-    summary = RunSummary(input_path)
-
-    # Extract the JSON summary
-    table_json = summary.get_table_json()
-    with open('run_metrics.json', 'wt') as handle_out:
-        handle_out.write(table_json)
-
-    table_html = summary.get_table_html()
-    with open('run_metrics.html', 'wt') as handle_out:
-        handle_out.write(table_html)
+    # Reruns on the same run folder (outside of the pipeline) reuse the tables cached in the run folder
+    write_run_stats(input_path, cache_dir=os.path.join(input_path, CACHE_DIR_NAME))
@@ -54,13 +54,7 @@ process extractStats {
 
 set -Eeuo pipefail
 
-run_summary.py runDir/
-
-plot_percent_base.py runDir/
-
-plot_tile_intensity.py runDir/
-
-plot_occupancy.py runDir/
+run_all.py runDir/ ${task.cpus}
     """
 
 }
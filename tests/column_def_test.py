@@ -0,0 +1,28 @@
+import math
+import unittest
+
+from bin.column_def import ColumnDef
+
+
+class LaneRow:
+    """ Stand-in for an InterOp row, the values are read through getter methods """
+    def __init__(self, reads: float):
+        self._reads = reads
+
+    def reads(self):
+        return self._reads
+
+
+class ColumnDefTest(unittest.TestCase):
+
+    def test_scaled_values_round_like_python_round(self):
+        column = ColumnDef('Reads', 'reads', scale=1E6)
+        # Halves such as 5000 (0.005) and 35000 (0.035) are where np.round and reciprocal scaling differ
+        counts = [float(count) for count in range(5000, 3_000_000, 10000)] + [math.nan]
+        rows = [LaneRow(count) for count in counts]
+
+        extract_raw = column.get_raw_extractor(rows[0])
+        values = column.format_raw_column([extract_raw(row) for row in rows], rows[0]).tolist()
+
+        self.assertEqual([round(count / 1E6, 2) for count in counts[:-1]], values[:-1])
+        self.assertTrue(math.isnan(values[-1]))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scripts in bin/ import each other as top level modules, as they do when run from the pipeline
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'bin'))
@@ -1,11 +1,18 @@
+import os
+import tempfile
 import unittest
 from pathlib import Path
 
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from interop import py_interop_run_metrics, py_interop_run
 
-from bin.plot_occupancy import plot_occupancy
+from bin.imaging_table import get_imaging_table
+from bin.plot_occupancy import plot_occupancy, OCCUPIED_COLUMN, PASS_FILTER_COLUMN
 from bin.plot_percent_base import plot_percent_base
-from bin.plot_tile_intensity import plot_tile_intensity
+from bin.plot_tile_intensity import plot_tile_intensity, list_metrics_to_load as list_intensity_metrics_to_load, \
+    _get_extraction_metric_intensity, _get_imaging_table_intensity
 from tests.test_helper import miseq_demo_path
 
 
@@ -21,6 +28,23 @@ class PlotTests(unittest.TestCase):
         plot_tile_intensity(miseq_demo_path)
         self.assertTrue(Path('max_intensity_1.svg').exists())
 
+    def test_tile_intensity_fallback_matches_imaging_table(self):
+        run_metrics = py_interop_run_metrics.run_metrics()
+        valid_to_load = py_interop_run.uchar_vector(py_interop_run.MetricCount, 0)
+        list_intensity_metrics_to_load(valid_to_load)
+        run_metrics.read(miseq_demo_path, valid_to_load)
+
+        columns = ['lane', 'tile', 'cycle', 'channel']
+        intensity_df = _get_imaging_table_intensity(get_imaging_table(run_metrics))
+        extraction_df = _get_extraction_metric_intensity(run_metrics)
+        self.assertIsNotNone(intensity_df)
+        self.assertFalse(extraction_df.empty)
+        pd.testing.assert_frame_equal(
+            intensity_df.sort_values(columns).reset_index(drop=True)[extraction_df.columns],
+            extraction_df.sort_values(columns).reset_index(drop=True),
+            check_dtype=False,
+        )
+
     def test_plot_occupancy_should_not_created_on_demo(self):
         """ MiSeq shouldn't have this data """
         plt.figure()
@@ -28,3 +52,23 @@ class PlotTests(unittest.TestCase):
         self.assertFalse(Path('occupancy_tile.jpg').exists())
         self.assertFalse(Path('occupancy_cycle.jpg').exists())
         self.assertFalse(Path('occupancy_read.jpg').exists())
+
+    def test_plot_occupancy(self):
+        """ Synthetic imaging table, as the demo data has no % Occupied """
+        rng = np.random.default_rng(0)
+        row_count = 2000
+        imaging_df = pd.DataFrame({
+            "Lane": rng.integers(1, 3, row_count),
+            "Tile": rng.integers(1101, 1120, row_count),
+            "Cycle": rng.integers(1, 30, row_count),
+            OCCUPIED_COLUMN: rng.uniform(40, 100, row_count),
+            PASS_FILTER_COLUMN: rng.uniform(40, 100, row_count),
+        })
+
+        # Rendered in-process with a single CPU and in worker processes with more
+        for cpus in [1, 3]:
+            with tempfile.TemporaryDirectory() as output_dir:
+                output_prefix = os.path.join(output_dir, 'occupancy')
+                plot_occupancy(miseq_demo_path, output_jpg_prefix=output_prefix, imaging_df=imaging_df, cpus=cpus)
+                for hue in ['tile', 'lane', 'cycle']:
+                    self.assertTrue(Path(f'{output_prefix}_{hue}.jpg').exists())
@@ -0,0 +1,44 @@
+import os
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+
+from bin.run_all import run_all
+from tests.test_helper import miseq_demo_path
+
+
+def get_svg_labels(path) -> set:
+    """ Texts drawn in a matplotlib SVG, which writes each one as a comment before its glyphs """
+    return set(re.findall(r'<!-- (.*?) -->', Path(path).read_text()))
+
+
+class RunAllTest(unittest.TestCase):
+
+    def test_run_all_writes_every_output(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as output_dir, tempfile.TemporaryDirectory() as run_dir:
+            # Stage the run folder as links to the input files, like the pipeline does
+            run_folder = os.path.join(run_dir, 'runDir')
+            os.mkdir(run_folder)
+            for name in os.listdir(miseq_demo_path):
+                os.symlink(os.path.join(miseq_demo_path, name), os.path.join(run_folder, name))
+
+            os.chdir(output_dir)
+            try:
+                open_figures = plt.get_fignums()
+                run_all(run_folder)
+                self.assertTrue(Path('run_metrics.json').exists())
+                self.assertTrue(Path('run_metrics.html').exists())
+                self.assertIn('% Base', get_svg_labels('percent_base.svg'))
+
+                # Each plot is drawn on its own figure, nothing of the % base plot ends up in the others
+                max_intensity_labels = get_svg_labels('max_intensity_1.svg')
+                self.assertIn('Lane 1', max_intensity_labels)
+                self.assertNotIn('% Base', max_intensity_labels)
+                self.assertNotIn('R1', max_intensity_labels)
+                self.assertEqual(plt.get_fignums(), open_figures)
+            finally:
+                os.chdir(cwd)
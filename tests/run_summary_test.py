@@ -1,7 +1,11 @@
 import json
+import os
+import tempfile
 import unittest
+from unittest import mock
 
-from bin.run_summary import RunSummary
+from bin.run_summary import RunSummary, HTML_TABLE_TAG, OUTPUT_KEY_FILE, READ_SUMMARY_COLUMNS, RUN_SUMMARY_COLUMNS, \
+    get_run_folder_key, outputs_are_current, _render_table, _to_html
 from tests.test_helper import miseq_demo_path
 
 
@@ -36,6 +40,13 @@ class RunSummaryTest(unittest.TestCase):
             self.assertIsNotNone(read[0]['Yield'])
             self.assertEqual(1, read[0]['Lane'])
 
+    def test_json_is_the_same_without_orjson(self):
+        summary = RunSummary(miseq_demo_path)
+        table_json = summary.get_table_json()
+
+        with mock.patch('bin.run_summary.orjson', None):
+            self.assertEqual(table_json, summary.get_table_json())
+
     def test_parse_miseq_data_html(self):
         # Run summary plus two read tables
         expected_number_of_tables = 3
@@ -48,3 +59,84 @@ class RunSummaryTest(unittest.TestCase):
 
         number_of_tables = table_html.count('<table')
         self.assertEqual(expected_number_of_tables, number_of_tables)
+
+    def test_html_tables_match_pandas(self):
+        summary = RunSummary(miseq_demo_path)
+        tables = [(summary.get_run_summary(), RUN_SUMMARY_COLUMNS)]
+        tables += [(summary.get_read_summary(read_num), READ_SUMMARY_COLUMNS) for read_num in range(0, 2)]
+
+        for df, columns in tables:
+            table_html = _to_html(df, columns)
+            self.assertTrue(table_html.startswith(HTML_TABLE_TAG))
+
+            # Every column left to pandas gives the same table
+            with mock.patch('bin.run_summary._format_html_column', return_value=None):
+                self.assertEqual(table_html, _to_html(df, columns))
+
+    def test_html_table_with_large_values_uses_pandas(self):
+        summary = RunSummary(miseq_demo_path)
+        df = summary.get_read_summary(0).copy()
+        df['Yield'] = 2E6
+
+        # Written by pandas, with the same table tag as the tables written directly
+        table_html = _to_html(df, READ_SUMMARY_COLUMNS)
+        pandas_html = _render_table(df, READ_SUMMARY_COLUMNS).to_html(index=False, border=0, classes=['sav-table'])
+        self.assertTrue(table_html.startswith(HTML_TABLE_TAG))
+        self.assertEqual(pandas_html.split('>', 1)[1], table_html.split('>', 1)[1])
+
+    def test_cached_tables_match_parsed_tables(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            summary = RunSummary(miseq_demo_path, cache_dir=cache_dir)
+            cached_summary = RunSummary(miseq_demo_path, cache_dir=cache_dir)
+
+            # The second instance is restored without reading the InterOp files
+            self.assertIsNone(cached_summary.run_metrics)
+            self.assertEqual(summary.get_table_json(), cached_summary.get_table_json())
+            self.assertEqual(summary.get_table_html(), cached_summary.get_table_html())
+            self.assertIsNone(cached_summary.run_metrics)
+
+    def test_damaged_cache_is_rebuilt(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            summary = RunSummary(miseq_demo_path, cache_dir=cache_dir)
+            with open(summary.cache_path, 'rt') as handle_in:
+                cache_text = handle_in.read()
+            with open(summary.cache_path, 'wt') as handle_out:
+                handle_out.write(cache_text[:len(cache_text) // 2])
+
+            # The truncated cache file is ignored, the tables are read from the run folder and the cache replaced
+            rebuilt_summary = RunSummary(miseq_demo_path, cache_dir=cache_dir)
+            self.assertIsNotNone(rebuilt_summary.run_metrics)
+            self.assertEqual(summary.get_table_json(), rebuilt_summary.get_table_json())
+            with open(summary.cache_path, 'rt') as handle_in:
+                self.assertEqual(cache_text, handle_in.read())
+            self.assertEqual([os.path.basename(summary.cache_path)], os.listdir(cache_dir))
+
+    def test_run_folder_key_is_the_same_for_staged_links(self):
+        with tempfile.TemporaryDirectory() as run_dir:
+            # Links to each of the input files, as staged into a Nextflow work directory
+            run_folder = os.path.join(run_dir, 'runDir')
+            os.makedirs(os.path.join(run_folder, 'InterOp'))
+            for name in ['RunInfo.xml', 'RunParameters.xml']:
+                os.symlink(os.path.join(miseq_demo_path, name), os.path.join(run_folder, name))
+            for name in os.listdir(os.path.join(miseq_demo_path, 'InterOp')):
+                os.symlink(os.path.join(miseq_demo_path, 'InterOp', name), os.path.join(run_folder, 'InterOp', name))
+
+            self.assertEqual(get_run_folder_key(miseq_demo_path), get_run_folder_key(run_folder))
+
+    def test_outputs_are_current_only_for_matching_key(self):
+        run_folder_key = get_run_folder_key(miseq_demo_path)
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as output_dir:
+            os.chdir(output_dir)
+            try:
+                with open('run_metrics.json', 'wt') as handle_out:
+                    handle_out.write('{}')
+                self.assertFalse(outputs_are_current(['run_metrics.json'], run_folder_key))
+
+                with open(OUTPUT_KEY_FILE, 'wt') as handle_out:
+                    handle_out.write(run_folder_key)
+                self.assertTrue(outputs_are_current(['run_metrics.json'], run_folder_key))
+                self.assertFalse(outputs_are_current(['run_metrics.json'], 'stale'))
+                self.assertFalse(outputs_are_current(['run_metrics.json', 'run_metrics.html'], run_folder_key))
+            finally:
+                os.chdir(cwd)